@@ -0,0 +1,27 @@
+from pathlib import Path
+import smartsettings as ss
+
+# Settings image file path
+IMAGE_SETTINGS_FILE_PATH = Path("settings/settings.img")
+
+# Add attributes on initialization
+settings = ss.SmartSettings(name="settings", values=[1, 2, 3])
+# Add subsettings
+settings.subsettings = ss.SmartSettings(name="subsettings", value=200)
+print(f"{settings = }")
+
+# Compile settings to a binary image file
+ss.to_image_file(settings, IMAGE_SETTINGS_FILE_PATH)
+
+# Map settings from the image file read-only
+# Every process mapping the same file shares the same memory pages
+# Values are only decoded when they are accessed
+mapped_settings = ss.from_image_file(IMAGE_SETTINGS_FILE_PATH)
+print(f"{mapped_settings = }")
+print(f"{mapped_settings.subsettings.value = }")
+
+# Decode the whole mapped tree into a writable settings object
+loaded_settings = mapped_settings._to_settings()
+
+# The 2 settings are equal
+print(loaded_settings == settings)
@@ -0,0 +1,23 @@
+import smartsettings as ss
+
+# Settings with nested subsettings, lists and dicts
+settings = ss.SmartSettings(
+    name="settings",
+    servers=[
+        ss.SmartSettings(host="localhost", port=8000),
+        ss.SmartSettings(host="example.com", port=8001),
+    ],
+    options=dict(debug=False),
+)
+print(f"{settings = }")
+
+# Get values by dotted/bracket paths
+# Non-existing path returns `default`
+print(settings._get_path("servers[1].host"))
+print(settings._get_many(["servers[0].port", "options.debug", "missing"]))
+
+# Set values by paths, e.g. from environment variables or CLI flags
+# Values of the same kind of container are merged like `_update_with`
+# Other values replace the current values outright
+settings._set_many({"servers[0].port": 9000, "options.debug": True})
+print(f"{settings = }")
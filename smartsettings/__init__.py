@@ -11,19 +11,29 @@ The `updatable` feature makes it suitable for value bindings.
 from .smartsettings import (
     UTC_TIME_STRING_FORMAT,
     SmartSettings,
+    MappedSettings,
+    MappedList,
+    MappedDict,
     from_string,
     from_file,
     to_string,
     to_file,
+    to_image_file,
+    from_image_file,
 )
 
 __all__ = [
     "UTC_TIME_STRING_FORMAT",
     "SmartSettings",
+    "MappedSettings",
+    "MappedList",
+    "MappedDict",
     "from_string",
     "from_file",
     "to_string",
     "to_file",
+    "to_image_file",
+    "from_image_file",
 ]
 
 # Project version
@@ -1,17 +1,59 @@
 from __future__ import annotations
+import os
+import re
+import stat
+import mmap
+import struct
 import datetime as dt
 from pathlib import Path
 from hashlib import sha256
 from copy import deepcopy
+from functools import lru_cache
+from threading import local
+from tempfile import NamedTemporaryFile
+from collections.abc import Mapping, Sequence
 from base64 import b64encode, b64decode
 
 import jsonpickle
+import jsonpickle.util
+import jsonpickle.unpickler
 from cryptomsg import CryptoMsg
 
 
 # Timestamp string format
 UTC_TIME_STRING_FORMAT = "%Y%m%dT%H%M%S%fZ"
 
+# Path token: `name` (`.name` after another token), `[3]`, `["key"]` or `['key']`
+_PATH_TOKEN = re.compile(
+    r"""(?:\A|(?<=[\w\]])\.)([A-Za-z_]\w*)|\[(-?\d+)\]|\[(["'])(.*?)\3\]"""
+)
+
+# Marker for missing values in path lookups
+_MISSING = object()
+
+# Mapped nodes being printed in the current thread, to print cycles as `...`
+_MAPPED_REPR_ACTIVE = local()
+
+# Binary settings image layout
+_IMAGE_MAGIC = b"SSIMG\x00\x00\x01"
+_IMAGE_HEADER = struct.Struct("<8sQ")
+_COUNT = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+# Binary settings image node tags
+_TAG_NONE = b"N"
+_TAG_TRUE = b"T"
+_TAG_FALSE = b"F"
+_TAG_INT = b"i"
+_TAG_FLOAT = b"f"
+_TAG_STR = b"s"
+_TAG_LIST = b"l"
+_TAG_DICT = b"d"
+_TAG_SETTINGS = b"o"
+_TAG_PICKLED = b"p"
+
 
 class SmartSettings:
     """The class of smart settings.
@@ -34,6 +76,8 @@ class SmartSettings:
         return str(self.__dict__)
 
     def __eq__(self, other: SmartSettings) -> bool:
+        if isinstance(other, MappedSettings):
+            return other == self
         if not isinstance(other, type(self)):
             return False
         if len(self.__dict__) != len(other.__dict__):
@@ -62,47 +106,225 @@ class SmartSettings:
             raise TypeError(f"{other} is not instance of {type(self)}.")
 
         for k in other.__dict__:
-            if k in self.__dict__:
-                if isinstance(self.__dict__[k], SmartSettings):
-                    self.__dict__[k]._update_with(other.__dict__[k])
-                elif isinstance(self.__dict__[k], list):
-                    self._update_list(self.__dict__[k], other.__dict__[k])
-                elif isinstance(self.__dict__[k], dict):
-                    self._update_dict(self.__dict__[k], other.__dict__[k])
-                else:
-                    self.__dict__[k] = deepcopy(other.__dict__[k])
-            else:
-                self.__dict__[k] = deepcopy(other.__dict__[k])
+            self._update_item(self.__dict__, k, other.__dict__[k])
 
         return self
 
     def _update_list(self, self_list: list, other_list: list):
         for i in range(len(other_list)):
-            if i < len(self_list):
-                if isinstance(self_list[i], SmartSettings):
-                    self_list[i]._update_with(other_list[i])
-                elif isinstance(self_list[i], list):
-                    self._update_list(self_list[i], other_list[i])
-                elif isinstance(self_list[i], dict):
-                    self._update_dict(self_list[i], other_list[i])
-                else:
-                    self_list[i] = deepcopy(other_list[i])
-            else:
-                self_list.append(deepcopy(other_list[i]))
+            self._update_item(self_list, i, other_list[i])
 
     def _update_dict(self, self_dict: dict, other_dict: list):
         for k in other_dict:
-            if k in self_dict:
-                if isinstance(self_dict[k], SmartSettings):
-                    self_dict[k]._update_with(other_dict[k])
-                elif isinstance(self_dict[k], list):
-                    self._update_list(self_dict[k], other_dict[k])
-                elif isinstance(self_dict[k], dict):
-                    self._update_dict(self_dict[k], other_dict[k])
-                else:
-                    self_dict[k] = deepcopy(other_dict[k])
+            self._update_item(self_dict, k, other_dict[k])
+
+    def _update_item(self, container: list | dict, key, value):
+        """Update one item of a list or dict in the same way as `_update_with`."""
+        if isinstance(container, list):
+            if key >= len(container):
+                container.append(deepcopy(value))
+                return
+        elif key not in container:
+            container[key] = deepcopy(value)
+            return
+
+        if isinstance(container[key], SmartSettings):
+            container[key]._update_with(value)
+        elif isinstance(container[key], list):
+            self._update_list(container[key], value)
+        elif isinstance(container[key], dict):
+            self._update_dict(container[key], value)
+        else:
+            container[key] = deepcopy(value)
+
+    def _get_path(self, path: str | tuple, default=None):
+        """Get a value by a path like `"a.b[3].c"`.
+
+        Args:
+            path: The dotted/bracket path string, or a tuple of keys and indices.
+            default: The value to return if the path does not exist.
+
+        Returns:
+            The value at the path.
+        """
+        return self._get_many([path], default=default)[0]
+
+    def _set_path(self, path: str | tuple, value) -> SmartSettings:
+        """Set a value by a path like `"a.b[3].c"`.
+
+        The value is applied in the same way as `_set_many`.
+
+        Args:
+            path: The dotted/bracket path string, or a tuple of keys and indices.
+            value: The value to set.
+
+        Returns:
+            The settings object itself.
+        """
+        return self._set_many({path: value})
+
+    def _get_many(self, paths, default=None) -> list:
+        """Get values by many paths in a single traversal.
+
+        Paths sharing a prefix only resolve the prefix once.
+
+        Args:
+            paths: An iterable of paths as accepted by `_get_path`.
+            default: The value to return for paths that do not exist.
+
+        Returns:
+            A list of values in the same order as `paths`.
+        """
+        keys_list = [_compile_path(path) for path in paths]
+        results = [default] * len(keys_list)
+
+        def walk(node, obj):
+            for i in node[0]:
+                results[i] = obj
+            for key, child in node[1].items():
+                value = _get_step(obj, key)
+                if value is not _MISSING:
+                    walk(child, value)
+
+        walk(_make_path_trie(keys_list), self)
+        return results
+
+    def _set_many(self, items) -> SmartSettings:
+        """Set values by many paths in a single traversal.
+
+        Each value is applied in the same way as `_update_with`
+        if it is the same kind of container as the current value,
+        e.g. a dict is merged into a dict and a list into a list.
+        Otherwise it replaces the current value outright,
+        so a string from an environment variable or a CLI flag
+        replaces a list instead of being merged character by character.
+        Values are not parsed, convert strings before setting them if needed.
+
+        When a path and its sub-path are both given, the sub-path is applied last.
+        A list index can be in range, or equal to the length of the list to append.
+
+        Args:
+            items: A dict or an iterable of `(path, value)` pairs.
+
+        Returns:
+            The settings object itself.
+
+        Raises:
+            KeyError: If an intermediate item of a path does not exist,
+                including names only defined on the class,
+                or a key does not suit its container.
+            IndexError: If a list index is out of range.
+            ValueError: If a path is invalid.
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        paths, values = [], []
+        for path, value in items:
+            keys = _compile_path(path)
+            if not keys:
+                raise KeyError(f"Empty path {path!r}.")
+            paths.append(keys)
+            values.append(value)
+
+        def walk(node, obj, prefix):
+            if isinstance(obj, SmartSettings):
+                container = obj.__dict__
+            elif isinstance(obj, (list, dict)):
+                container = obj
             else:
-                self_dict[k] = deepcopy(other_dict[k])
+                raise KeyError(f"Path {prefix} is not a settings container.")
+            for key, child in node[1].items():
+                path = prefix + (key,)
+                for i in child[0]:
+                    _check_set_step(obj, key, path)
+                    # Like `_update_with`, only the instance `__dict__` is used,
+                    # never class attributes or methods
+                    current = _get_step(container, key)
+                    if current is _MISSING or _is_same_container(current, values[i]):
+                        self._update_item(container, key, values[i])
+                    else:
+                        container[key] = deepcopy(values[i])
+                if child[1]:
+                    value = _get_step(container, key)
+                    if value is _MISSING:
+                        raise KeyError(f"Path {path} does not exist.")
+                    walk(child, value, path)
+
+        walk(_make_path_trie(paths), self, ())
+        return self
+
+
+@lru_cache(maxsize=1024)
+def _compile_path(path: str | tuple) -> tuple:
+    """Compile a path like `"a.b[3].c"` into a tuple of keys and indices.
+
+    Compiled paths are cached, so repeated lookups skip the parsing.
+    """
+    if isinstance(path, tuple):
+        return path
+
+    keys = []
+    position = 0
+    while position < len(path):
+        match = _PATH_TOKEN.match(path, position)
+        if match is None:
+            raise ValueError(f"Invalid settings path {path!r}.")
+        name, index, _, quoted = match.groups()
+        if name is not None:
+            keys.append(name)
+        elif index is not None:
+            keys.append(int(index))
+        else:
+            keys.append(quoted)
+        position = match.end()
+    return tuple(keys)
+
+
+def _make_path_trie(paths: list) -> tuple:
+    """Group compiled paths into a trie of `(indices, children)` nodes."""
+    root = ([], {})
+    for i, keys in enumerate(paths):
+        node = root
+        for key in keys:
+            node = node[1].setdefault(key, ([], {}))
+        node[0].append(i)
+    return root
+
+
+def _get_step(obj, key):
+    """Get one item of a settings object, list or dict, or `_MISSING`."""
+    if isinstance(obj, SmartSettings):
+        return getattr(obj, key, _MISSING) if isinstance(key, str) else _MISSING
+    if isinstance(obj, list):
+        if isinstance(key, int) and -len(obj) <= key < len(obj):
+            return obj[key]
+        return _MISSING
+    if isinstance(obj, dict):
+        return obj.get(key, _MISSING)
+    return _MISSING
+
+
+def _check_set_step(obj, key, path: tuple):
+    """Check that `key` can be set on a settings object, list or dict."""
+    if isinstance(obj, SmartSettings):
+        if not isinstance(key, str):
+            raise KeyError(f"Path {path} needs a name for a settings object.")
+    elif isinstance(obj, list):
+        if not isinstance(key, int):
+            raise KeyError(f"Path {path} needs an index for a list.")
+        if not -len(obj) <= key <= len(obj):
+            raise IndexError(f"Path {path} index is out of range.")
+
+
+def _is_same_container(current, value) -> bool:
+    """Check if `value` can be merged into `current` like `_update_with`."""
+    if isinstance(current, SmartSettings):
+        return isinstance(value, type(current))
+    if isinstance(current, list):
+        return isinstance(value, list)
+    if isinstance(current, dict):
+        return isinstance(value, dict)
+    return True
 
 
 def from_string(
@@ -255,3 +477,474 @@ def _delete_backup_files(path: Path | str, backup_num: int | None = None):
         delete_list = backup_list[:-backup_num] if backup_num else backup_list
         for item in delete_list:
             item.unlink(missing_ok=True)
+
+
+class _MappedNode:
+    """The base class of read-only views on nodes of a memory-mapped image."""
+
+    __slots__ = ("_image", "_offset")
+
+    def __init__(self, image: mmap.mmap, offset: int) -> None:
+        object.__setattr__(self, "_image", image)
+        object.__setattr__(self, "_offset", offset)
+
+    def __len__(self) -> int:
+        return _COUNT.unpack_from(self._image, self._offset + 1)[0]
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' object is read-only.")
+
+    def __setitem__(self, index, value):
+        raise TypeError(f"'{type(self).__name__}' object is read-only.")
+
+    def __delitem__(self, index):
+        raise TypeError(f"'{type(self).__name__}' object is read-only.")
+
+    def __copy__(self):
+        # Read-only views can be shared instead of copied
+        return self
+
+    def _guarded_repr(self, build, placeholder: str) -> str:
+        """Return `build()`, or `placeholder` if this node is already being printed.
+
+        Every access makes new views, so the cycle guard of the builtin containers
+        cannot see that a mapped node refers back to itself.
+        """
+        if not hasattr(_MAPPED_REPR_ACTIVE, "nodes"):
+            _MAPPED_REPR_ACTIVE.nodes = set()
+        node = (id(self._image), self._offset)
+        if node in _MAPPED_REPR_ACTIVE.nodes:
+            return placeholder
+        _MAPPED_REPR_ACTIVE.nodes.add(node)
+        try:
+            return build()
+        finally:
+            _MAPPED_REPR_ACTIVE.nodes.discard(node)
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _MappedTable(_MappedNode):
+    """The base class of views on key-value nodes (settings and dicts).
+
+    The node layout is the tag, the entry count, the `(key, value)` offset entries,
+    then the count and the indices of the string keys sorted by their encoded bytes.
+    """
+
+    __slots__ = ()
+
+    def _entries(self):
+        image = self._image
+        position = self._offset + 1 + _COUNT.size
+        for _ in range(len(self)):
+            key = _OFFSET.unpack_from(image, position)[0]
+            value = _OFFSET.unpack_from(image, position + _OFFSET.size)[0]
+            yield key, value
+            position += 2 * _OFFSET.size
+
+    def _items(self):
+        for key, value in self._entries():
+            yield (
+                _decode_image_node(self._image, key),
+                _decode_image_node(self._image, value),
+            )
+
+    def _index_position(self) -> int:
+        return self._offset + 1 + _COUNT.size + len(self) * 2 * _OFFSET.size
+
+    def _find(self, name):
+        """Return the offset of the value node for `name`, or `None`."""
+        image = self._image
+        entries = self._offset + 1 + _COUNT.size
+        if not isinstance(name, str):
+            # Only string keys are indexed, others are rare in settings
+            for key, value in self._entries():
+                if _decode_image_node(image, key) == name:
+                    return value
+            return None
+
+        # Binary search the sorted string keys
+        target = name.encode()
+        index = self._index_position()
+        low, high = 0, _COUNT.unpack_from(image, index)[0]
+        index += _COUNT.size
+        while low < high:
+            middle = (low + high) // 2
+            i = _COUNT.unpack_from(image, index + middle * _COUNT.size)[0]
+            position = entries + i * 2 * _OFFSET.size
+            key = _read_image_str_bytes(image, _OFFSET.unpack_from(image, position)[0])
+            if key < target:
+                low = middle + 1
+            elif key > target:
+                high = middle
+            else:
+                return _OFFSET.unpack_from(image, position + _OFFSET.size)[0]
+        return None
+
+
+class MappedSettings(_MappedTable):
+    """The class of read-only memory-mapped settings.
+
+    Instances are returned by `from_image_file` and should not be created directly.
+    All the processes mapping the same image file share the same memory pages,
+    and values are only decoded when they are accessed.
+
+    Equality comparison is defined against `MappedSettings` and `SmartSettings`.
+    Indexing operator is defined for accessing the attributes.
+    Nested settings are returned as `MappedSettings` as well,
+    lists and dicts as read-only `MappedList` and `MappedDict` views.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return self._guarded_repr(lambda: str(dict(self._items())), "{...}")
+
+    def __bool__(self) -> bool:
+        # Like `SmartSettings`, which defines no length, settings are always truthy
+        return True
+
+    def __eq__(self, other) -> bool:
+        # Settings of different classes are never equal, like `SmartSettings`
+        if isinstance(other, MappedSettings):
+            other_class_name = other._class_name()
+            other_items = dict(other._items())
+        elif isinstance(other, SmartSettings):
+            other_class_name = jsonpickle.util.importable_name(type(other))
+            other_items = other.__dict__
+        else:
+            return False
+        if self._class_name() != other_class_name:
+            return False
+        # Keep the mapped values on the left so that they handle the comparison
+        return dict(self._items()) == other_items
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self._find(name) is not None
+
+    def __iter__(self):
+        for key, _ in self._entries():
+            yield _decode_image_node(self._image, key)
+
+    def __getattr__(self, name):
+        if name in _MappedNode.__slots__:
+            # Not initialized, e.g. while being copied
+            raise AttributeError(name)
+        offset = self._find(name) if isinstance(name, str) else None
+        if offset is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        return _decode_image_node(self._image, offset)
+
+    def __getitem__(self, index):
+        offset = self._find(index) if isinstance(index, str) else None
+        if offset is None:
+            return None
+        return _decode_image_node(self._image, offset)
+
+    def _to_settings(self) -> SmartSettings:
+        """Decode the whole mapped tree into a writable settings object.
+
+        The stored settings class is restored,
+        and shared or cyclic references are preserved.
+        """
+        return _materialize_mapped(self, {})
+
+    def _settings_class(self) -> type:
+        """Return the stored settings class, or `SmartSettings` if it is unavailable."""
+        cls = jsonpickle.unpickler.loadclass(self._class_name())
+        if isinstance(cls, type) and issubclass(cls, SmartSettings):
+            return cls
+        return SmartSettings
+
+    def _class_name(self) -> str:
+        index = self._index_position()
+        position = index + _COUNT.size * (1 + _COUNT.unpack_from(self._image, index)[0])
+        return _decode_image_node(
+            self._image, _OFFSET.unpack_from(self._image, position)[0]
+        )
+
+
+class MappedList(_MappedNode, Sequence):
+    """The class of read-only views on lists in a memory-mapped image.
+
+    Items are only decoded when they are accessed.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return self._guarded_repr(lambda: str(list(self)), "[...]")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (list, MappedList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("MappedList index out of range")
+        position = self._offset + 1 + _COUNT.size + index * _OFFSET.size
+        return _decode_image_node(
+            self._image, _OFFSET.unpack_from(self._image, position)[0]
+        )
+
+
+class MappedDict(_MappedTable, Mapping):
+    """The class of read-only views on dicts in a memory-mapped image.
+
+    String keys are looked up by binary search,
+    and values are only decoded when they are accessed.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return self._guarded_repr(lambda: str(dict(self._items())), "{...}")
+
+    def __iter__(self):
+        for key, _ in self._entries():
+            yield _decode_image_node(self._image, key)
+
+    def __getitem__(self, key):
+        offset = self._find(key)
+        if offset is None:
+            raise KeyError(key)
+        return _decode_image_node(self._image, offset)
+
+
+def to_image_file(settings, path: Path | str):
+    """Store settings to a binary image file for `from_image_file`.
+
+    The file is replaced atomically, so processes still mapping the old image
+    keep reading consistent data.
+    Shared and cyclic references are stored once.
+    A new file gets the mode of a normal file, an existing file keeps its mode.
+
+    Args:
+        settings: The settings to be stored.
+        path: The path of the output file.
+    """
+
+    buffer = bytearray(_IMAGE_HEADER.size)
+    root = _encode_image_node(buffer, settings, {})
+    _IMAGE_HEADER.pack_into(buffer, 0, _IMAGE_MAGIC, root)
+
+    file_path = Path(path)
+    if not file_path.parent.exists():
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(
+        dir=file_path.parent,
+        prefix=file_path.name + ".",
+        suffix=".tmp",
+        delete=False,
+    ) as f:
+        f.write(buffer)
+    try:
+        # Temporary files are private, give the image the mode of a normal file
+        if file_path.exists():
+            mode = stat.S_IMODE(file_path.stat().st_mode)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(f.name, mode)
+        os.replace(f.name, file_path)
+    except OSError:
+        Path(f.name).unlink(missing_ok=True)
+        raise
+
+
+def from_image_file(path: Path | str):
+    """Map settings from a binary image file read-only.
+
+    The image is memory-mapped instead of being decoded, so it is cheap
+    to open the same file from many worker processes.
+
+    Args:
+        path: The path of the input file made by `to_image_file`.
+
+    Returns:
+        A `MappedSettings` object if the stored root is a settings object,
+        otherwise the decoded root value.
+    """
+
+    with open(path, "rb") as f:
+        # `mmap` cannot map an empty file
+        if os.fstat(f.fileno()).st_size < _IMAGE_HEADER.size:
+            raise ValueError(f"{path} is not a settings image file.")
+        image = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, root = _IMAGE_HEADER.unpack_from(image, 0)
+    if magic != _IMAGE_MAGIC:
+        raise ValueError(f"{path} is not a settings image file.")
+
+    return _decode_image_node(image, root)
+
+
+def _encode_image_node(buffer: bytearray, value, memo: dict) -> int:
+    """Append a value node to `buffer` and return its offset.
+
+    Container nodes are reserved before their children are encoded,
+    so `memo` can map repeated containers (including cycles) to one node.
+    """
+    if value is None:
+        offset = len(buffer)
+        buffer += _TAG_NONE
+    elif value is True:
+        offset = len(buffer)
+        buffer += _TAG_TRUE
+    elif value is False:
+        offset = len(buffer)
+        buffer += _TAG_FALSE
+    elif type(value) is int and -(2**63) <= value < 2**63:
+        offset = len(buffer)
+        buffer += _TAG_INT + _INT.pack(value)
+    elif type(value) is float:
+        offset = len(buffer)
+        buffer += _TAG_FLOAT + _FLOAT.pack(value)
+    elif type(value) is str:
+        offset = len(buffer)
+        data = value.encode()
+        buffer += _TAG_STR + _COUNT.pack(len(data)) + data
+    elif id(value) in memo:
+        offset = memo[id(value)]
+    elif type(value) is list:
+        offset = len(buffer)
+        memo[id(value)] = offset
+        buffer += _TAG_LIST + _COUNT.pack(len(value))
+        buffer += bytes(len(value) * _OFFSET.size)
+        for i, item in enumerate(value):
+            child = _encode_image_node(buffer, item, memo)
+            _OFFSET.pack_into(
+                buffer, offset + 1 + _COUNT.size + i * _OFFSET.size, child
+            )
+    elif type(value) is dict:
+        offset = _encode_image_table(buffer, _TAG_DICT, value, value, memo)
+    elif isinstance(value, SmartSettings):
+        offset = _encode_image_table(
+            buffer,
+            _TAG_SETTINGS,
+            value,
+            value.__dict__,
+            memo,
+            class_name=jsonpickle.util.importable_name(type(value)),
+        )
+    else:
+        # Anything else falls back to jsonpickle
+        offset = len(buffer)
+        data = jsonpickle.encode(value).encode()
+        buffer += _TAG_PICKLED + _COUNT.pack(len(data)) + data
+    return offset
+
+
+def _encode_image_table(
+    buffer: bytearray,
+    tag: bytes,
+    value,
+    table: dict,
+    memo: dict,
+    class_name: str | None = None,
+) -> int:
+    """Append a key-value node for a settings object or dict and return its offset."""
+    items = list(table.items())
+    str_indices = sorted(
+        (i for i, (k, _) in enumerate(items) if type(k) is str),
+        key=lambda i: items[i][0].encode(),
+    )
+
+    offset = len(buffer)
+    memo[id(value)] = offset
+    buffer += tag + _COUNT.pack(len(items))
+    buffer += bytes(len(items) * 2 * _OFFSET.size)
+    buffer += _COUNT.pack(len(str_indices))
+    for i in str_indices:
+        buffer += _COUNT.pack(i)
+    class_position = len(buffer)
+    if class_name is not None:
+        buffer += bytes(_OFFSET.size)
+
+    position = offset + 1 + _COUNT.size
+    for k, v in items:
+        key = _encode_image_node(buffer, k, memo)
+        child = _encode_image_node(buffer, v, memo)
+        _OFFSET.pack_into(buffer, position, key)
+        _OFFSET.pack_into(buffer, position + _OFFSET.size, child)
+        position += 2 * _OFFSET.size
+    if class_name is not None:
+        _OFFSET.pack_into(
+            buffer, class_position, _encode_image_node(buffer, class_name, memo)
+        )
+    return offset
+
+
+def _read_image_str_bytes(image: mmap.mmap, offset: int) -> bytes:
+    """Read the raw bytes of a string (or pickled) node."""
+    length = _COUNT.unpack_from(image, offset + 1)[0]
+    start = offset + 1 + _COUNT.size
+    return image[start : start + length]
+
+
+def _decode_image_node(image: mmap.mmap, offset: int):
+    """Decode the value node at `offset`, keeping settings objects mapped."""
+    tag = image[offset : offset + 1]
+    if tag == _TAG_NONE:
+        return None
+    if tag == _TAG_TRUE:
+        return True
+    if tag == _TAG_FALSE:
+        return False
+    if tag == _TAG_INT:
+        return _INT.unpack_from(image, offset + 1)[0]
+    if tag == _TAG_FLOAT:
+        return _FLOAT.unpack_from(image, offset + 1)[0]
+    if tag == _TAG_STR:
+        return _read_image_str_bytes(image, offset).decode()
+    if tag == _TAG_SETTINGS:
+        return MappedSettings(image, offset)
+    if tag == _TAG_PICKLED:
+        return jsonpickle.decode(_read_image_str_bytes(image, offset).decode())
+
+    if tag == _TAG_LIST:
+        return MappedList(image, offset)
+    if tag == _TAG_DICT:
+        return MappedDict(image, offset)
+
+    raise ValueError(f"Unknown settings image node tag {tag!r} at {offset}.")
+
+
+def _materialize_mapped(value, memo: dict):
+    """Recursively replace the mapped views with writable objects.
+
+    `memo` maps node offsets to the objects already built,
+    so shared and cyclic references are preserved.
+    """
+    if not isinstance(value, _MappedNode):
+        return value
+    if value._offset in memo:
+        return memo[value._offset]
+
+    if isinstance(value, MappedSettings):
+        cls = value._settings_class()
+        # Bypass `__init__` like jsonpickle, subclasses may require arguments
+        result = cls.__new__(cls)
+        memo[value._offset] = result
+        for k, v in value._items():
+            result.__dict__[k] = _materialize_mapped(v, memo)
+    elif isinstance(value, MappedList):
+        result = []
+        memo[value._offset] = result
+        result.extend(_materialize_mapped(item, memo) for item in value)
+    else:
+        result = {}
+        memo[value._offset] = result
+        for k, v in value._items():
+            result[k] = _materialize_mapped(v, memo)
+    return result
@@ -1,3 +1,5 @@
+import os
+import stat
 from pathlib import Path
 import pytest
 import smartsettings as ss
@@ -215,3 +217,212 @@ def test_dictionary_settings():
     print(loaded_settings == settings)
 
     assert loaded_settings == settings
+
+
+def test_mapped_settings_file():
+    # Settings image file path
+    IMAGE_SETTINGS_FILE_PATH = Path("settings/settings.img")
+
+    # Add attributes on initialization
+    settings = ss.SmartSettings(name="settings", values=[1, 2, 3])
+    # Add subsettings
+    settings.subsettings = ss.SmartSettings(name="subsettings", value=200)
+    print(f"{settings = }")
+
+    # Compile settings to a binary image file
+    ss.to_image_file(settings, IMAGE_SETTINGS_FILE_PATH)
+
+    # Map settings from the image file read-only
+    mapped_settings = ss.from_image_file(IMAGE_SETTINGS_FILE_PATH)
+    print(f"{mapped_settings = }")
+
+    assert mapped_settings.subsettings.value == 200
+    assert mapped_settings["values"] == [1, 2, 3]
+    assert mapped_settings["missing_value"] is None
+    with pytest.raises(AttributeError):
+        mapped_settings.missing_value
+    with pytest.raises(AttributeError):
+        mapped_settings.name = "changed"
+
+    # Decode the whole mapped tree into a writable settings object
+    loaded_settings = mapped_settings._to_settings()
+    print(loaded_settings == settings)
+
+    assert loaded_settings == settings
+
+
+def test_mapped_settings_values():
+    parent_settings = ParentSettings(
+        name="parent",
+        children=[
+            ChildSettings(name="first child", value=100),
+            ChildSettings(name="second child", value=2**70),
+        ],
+    )
+    parent_settings.extra = dict(ratio=0.5, flags=[True, False, None], unicode="αβγ")
+    parent_settings.pair = (1, 2)
+
+    ss.to_image_file(parent_settings, "settings/values.img")
+    mapped_settings = ss.from_image_file("settings/values.img")
+
+    assert isinstance(mapped_settings.children, ss.MappedList)
+    assert isinstance(mapped_settings.children[0], ss.MappedSettings)
+    assert mapped_settings.children[-1].value == 2**70
+    assert isinstance(mapped_settings.extra, ss.MappedDict)
+    assert mapped_settings.extra["unicode"] == "αβγ"
+    assert mapped_settings.extra == parent_settings.extra
+    assert mapped_settings.pair == (1, 2)
+    assert repr(mapped_settings) == repr(parent_settings)
+    assert mapped_settings == parent_settings
+    assert parent_settings == mapped_settings
+    assert mapped_settings.children[0] == mapped_settings.children[0]
+
+    # Settings of another class are not equal, like `SmartSettings`
+    other_settings = ss.SmartSettings(name="first child", value=100)
+    assert mapped_settings.children[0] != other_settings
+    assert other_settings != mapped_settings.children[0]
+    assert mapped_settings.children[0] != mapped_settings
+
+    # The settings classes are restored
+    loaded_settings = mapped_settings._to_settings()
+    assert type(loaded_settings.children[0]) is ChildSettings
+    assert loaded_settings == parent_settings
+    assert parent_settings == loaded_settings
+
+
+def test_mapped_settings_references():
+    # Empty settings are truthy like `SmartSettings`
+    settings = ss.SmartSettings(empty=ss.SmartSettings())
+    # Shared and cyclic references
+    shared = ss.SmartSettings(value=1)
+    settings.first = shared
+    settings.second = shared
+    settings.me = settings
+    settings.items = [1]
+    settings.items.append(settings.items)
+
+    ss.to_image_file(settings, "settings/references.img")
+    mapped_settings = ss.from_image_file("settings/references.img")
+
+    # Cycles are printed as `...` like `SmartSettings`
+    assert repr(mapped_settings) == repr(settings)
+    assert repr(mapped_settings.items) == "[1, [...]]"
+
+    assert mapped_settings.empty
+    assert len(mapped_settings.empty) == 0
+    assert mapped_settings.me.me.first.value == 1
+
+    loaded_settings = mapped_settings._to_settings()
+    assert loaded_settings.first is loaded_settings.second
+    assert loaded_settings.items[1] is loaded_settings.items
+    assert loaded_settings.me is loaded_settings
+
+
+def test_mapped_settings_file_checks():
+    IMAGE_SETTINGS_FILE_PATH = Path("settings/checks.img")
+    IMAGE_SETTINGS_FILE_PATH.unlink(missing_ok=True)
+
+    # A new image file gets the mode of a normal file
+    ss.to_image_file(ss.SmartSettings(value=1), IMAGE_SETTINGS_FILE_PATH)
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(IMAGE_SETTINGS_FILE_PATH.stat().st_mode) == 0o666 & ~umask
+
+    # An existing image file keeps its mode
+    IMAGE_SETTINGS_FILE_PATH.chmod(0o640)
+    ss.to_image_file(ss.SmartSettings(value=2), IMAGE_SETTINGS_FILE_PATH)
+    assert stat.S_IMODE(IMAGE_SETTINGS_FILE_PATH.stat().st_mode) == 0o640
+
+    # Empty, truncated or foreign files are rejected
+    for data in [b"", b"SSIMG", b"not a settings image file"]:
+        IMAGE_SETTINGS_FILE_PATH.write_bytes(data)
+        with pytest.raises(ValueError, match="is not a settings image file"):
+            ss.from_image_file(IMAGE_SETTINGS_FILE_PATH)
+
+
+def test_settings_path():
+    # Settings with nested subsettings, lists and dicts
+    settings = ss.SmartSettings(
+        name="settings",
+        servers=[
+            ss.SmartSettings(host="localhost", port=8000),
+            ss.SmartSettings(host="example.com", port=8001),
+        ],
+        options={"debug": False, "dotted.key": 1},
+    )
+
+    assert settings._get_path("servers[1].host") == "example.com"
+    assert settings._get_path(("servers", -1, "port")) == 8001
+    assert settings._get_many(
+        ["servers[0].port", "options.debug", "options['dotted.key']", "missing"],
+        default="default",
+    ) == [8000, False, 1, "default"]
+
+    # Each value is applied in the same way as `_update_with`
+    settings._set_many(
+        {
+            "servers[0].port": 9000,
+            "servers[1]": ss.SmartSettings(tls=True),
+            "servers[2]": ss.SmartSettings(host="new.com", port=8002),
+            "options.debug": True,
+        }
+    )
+    assert settings.servers[0].port == 9000
+    assert settings.servers[1] == ss.SmartSettings(
+        host="example.com", port=8001, tls=True
+    )
+    assert settings.servers[2].host == "new.com"
+    assert settings.options["debug"] is True
+
+    # Values of another kind replace the current value outright
+    settings._set_path("servers", "a,b")
+    settings._set_path("options", None)
+    assert settings.servers == "a,b"
+    assert settings.options is None
+
+    with pytest.raises(KeyError):
+        settings._set_path("missing.value", 1)
+    for path in ["servers[one]", ".a", "a.", "a..b", "a b"]:
+        with pytest.raises(ValueError):
+            settings._get_path(path)
+
+
+def test_settings_path_errors():
+    settings = ss.SmartSettings(values=[1, 2, 3])
+
+    # A list index can be in range or equal to the length to append
+    settings._set_path("values[3]", 4)
+    settings._set_path("values[-1]", 40)
+    assert settings.values == [1, 2, 3, 40]
+
+    with pytest.raises(IndexError):
+        settings._set_path("values[10]", 9)
+    with pytest.raises(IndexError):
+        settings._set_path("values[-10]", 9)
+    with pytest.raises(KeyError):
+        settings._set_path("values.x", 1)
+    with pytest.raises(KeyError):
+        settings._set_path("[0]", 5)
+    assert list(settings.__dict__) == ["values"]
+
+
+class DefaultSettings(ss.SmartSettings):
+    hosts = ["a", "b"]
+
+
+def test_settings_path_class_defaults():
+    settings = DefaultSettings()
+    other_settings = DefaultSettings()
+
+    # Reads see class defaults like the indexing operator
+    assert settings._get_path("hosts[0]") == "a"
+
+    # Writes only use the instance `__dict__` like `_update_with`
+    with pytest.raises(KeyError):
+        settings._set_path("hosts[0]", "z")
+    with pytest.raises(KeyError):
+        settings._set_path("_update_with.x", 1)
+    settings._set_path("hosts", ["z"])
+    assert settings.hosts == ["z"]
+    assert other_settings.hosts == ["a", "b"]
+    assert DefaultSettings.hosts == ["a", "b"]